@@ -1,8 +1,7 @@
+import os
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from utils import (load_and_preprocess_data, generate_association_rules,
+from utils import (load_and_preprocess_data, mine_frequent_itemsets, extract_rules,
                   evaluate_rules, format_rule, print_rule_metrics)
 
 # Dictionnaire de correspondance des variables
@@ -63,13 +62,18 @@ VARIABLE_MAPPING = {
 
 
 
+# Noms lisibles précalculés une seule fois au chargement du module
+_PRETTY = {code: name.replace("_", " ").title() for code, name in VARIABLE_MAPPING.items()}
+
+
 def format_rule_with_names(rule):
     """Version améliorée qui gère les noms longs"""
-    def clean_name(name):
-        return name.replace("_", " ").title()
+    def clean_name(var):
+        pretty = _PRETTY.get(var)
+        return pretty if pretty is not None else var.replace("_", " ").title()
     
-    antecedents = [clean_name(VARIABLE_MAPPING.get(var, var)) for var in rule['antecedents']]
-    consequents = [clean_name(VARIABLE_MAPPING.get(var, var)) for var in rule['consequents']]
+    antecedents = [clean_name(var) for var in rule['antecedents']]
+    consequents = [clean_name(var) for var in rule['consequents']]
     
     return f"{' + '.join(antecedents)} ⇒ {' + '.join(consequents)}"
 
@@ -86,6 +90,7 @@ st.sidebar.markdown("""
 ### Aide sur les paramètres
 - **Support Minimum** : Fréquence minimale des règles (0.001 = 0.1% des transactions)
 - **Confiance Minimum** : Fiabilité minimale des règles (0.3 = 30% de confiance)
+- **Longueur Maximale** : Nombre maximal d'items par itemset (plus petit = plus rapide)
 """)
 
 # Ajuster les plages des sliders
@@ -107,18 +112,50 @@ min_confidence = st.sidebar.slider(
     help="Fiabilité minimale des règles (0.3 = 30% de confiance)"
 )
 
+max_len = st.sidebar.slider(
+    "Longueur Maximale",
+    min_value=2,
+    max_value=6,
+    value=4,
+    step=1,
+    help="Nombre maximal d'items par itemset (limite le temps de calcul)"
+)
+
 # Afficher la légende des variables dans la barre latérale
+@st.cache_data
+def _legend_md():
+    return "\n".join(f"- **{code}** : {name}" for code, name in VARIABLE_MAPPING.items())
+
 st.sidebar.header("Légende des Variables")
-for code, name in VARIABLE_MAPPING.items():
-    st.sidebar.write(f"{code} : {name}")
+st.sidebar.markdown(_legend_md())
 
-# Chargement des données
-@st.cache_data
-def load_data():
-    return load_and_preprocess_data('data/healthcare-dataset-stroke-data.csv')
+DATA_PATH = 'data/healthcare-dataset-stroke-data.csv'
+UTILS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'utils.py')
+
+def _data_fingerprint():
+    """Empreinte des entrées du prétraitement (CSV et utils.py), utilisée comme clé des caches disque"""
+    csv_stat = os.stat(DATA_PATH)
+    return (csv_stat.st_mtime, csv_stat.st_size, os.path.getmtime(UTILS_PATH))
+
+# Chargement des données (l'empreinte invalide le cache si le CSV ou le prétraitement change)
+@st.cache_data(persist="disk", show_spinner="Chargement des données...")
+def load_data(fingerprint):
+    return load_and_preprocess_data(DATA_PATH)
+
+# Extraction des itemsets (df non haché : identifié par l'empreinte)
+@st.cache_data(persist="disk", show_spinner="Extraction des itemsets fréquents...")
+def _mine_itemsets(_df, fingerprint, min_support, max_len):
+    return mine_frequent_itemsets(_df, min_support, max_len)
+
+# Extraction des règles : déplacer la confiance ne relance pas le minage.
+# Les itemsets (frozensets, hachage instable) sont identifiés par leurs paramètres.
+@st.cache_data(persist="disk", show_spinner="Génération des règles...")
+def _extract_rules(_itemsets, fingerprint, min_support, max_len, min_confidence):
+    return extract_rules(_itemsets, min_confidence)
 
 try:
-    df = load_data()
+    fingerprint = _data_fingerprint()
+    df = load_data(fingerprint)
     
     # Afficher les statistiques de base
     st.header("Aperçu des Données")
@@ -127,7 +164,11 @@ try:
     
     # Générer les règles
     try:
-        rules = generate_association_rules(df, min_support, min_confidence)
+        itemsets = _mine_itemsets(df, fingerprint, min_support, max_len)
+        if itemsets.empty:
+            rules = pd.DataFrame()
+        else:
+            rules = _extract_rules(itemsets, fingerprint, min_support, max_len, min_confidence)
         
         if rules.empty:
             st.warning("""
@@ -151,27 +192,31 @@ try:
             metric_names = ["Lift (Indépendance)", "Confiance (Fiabilité)", "Conviction (Dépendance)", 
                            "Jaccard (Similarité)", "Certainty Factor (Certitude)", "Information Gain (Information)"]
             
+            # Meilleures règles matérialisées une fois en listes de dictionnaires
+            top5 = {m: evaluated_rules[m].head(5).to_dict('records') for m in metrics}
+            
             for tab, metric, name in zip(tabs, metrics, metric_names):
                 with tab:
                     st.subheader(f"Meilleures règles par {name}")
-                    for idx, rule in evaluated_rules[metric].head(5).iterrows():
-                        with st.expander(f"Règle {idx+1}: {format_rule_with_names(rule)}"):
-                            st.write(f"Support: {rule['support']:.3f}")
-                            st.write(f"Confidence: {rule['confidence']:.3f}")
-                            st.write(f"Lift: {rule['lift']:.3f}")
-                            st.write(f"Conviction: {rule['conviction']:.3f}")
-                            st.write(f"Leverage: {rule['leverage']:.3f}")
-                            st.write(f"Jaccard: {rule['jaccard']:.3f}")
-                            st.write(f"Certainty Factor: {rule['certainty_factor']:.3f}")
-                            st.write(f"Information Gain: {rule['information_gain']:.3f}")
+                    # Un seul tableau par onglet au lieu d'un st.write par métrique
+                    table = pd.DataFrame([{
+                        'Règle': format_rule_with_names(rule),
+                        'Support': rule['support'],
+                        'Confidence': rule['confidence'],
+                        'Lift': rule['lift'],
+                        'Conviction': rule['conviction'],
+                        'Leverage': rule['leverage'],
+                        'Jaccard': rule['jaccard'],
+                        'Certainty Factor': rule['certainty_factor'],
+                        'Information Gain': rule['information_gain'],
+                    } for rule in top5[metric]]).round(3)
+                    st.dataframe(table, hide_index=True, use_container_width=True)
             
             # Visualisation
             st.header("Visualisation des Métriques")
-            fig, ax = plt.subplots(figsize=(12, 6))
-            sns.scatterplot(data=rules, x='support', y='confidence', size='lift', hue='jaccard', ax=ax)
-            plt.title('Relation entre Support, Confiance, Lift et Jaccard')
-            st.pyplot(fig)
-            plt.close()
+            st.caption('Relation entre Support, Confiance, Lift et Jaccard')
+            st.scatter_chart(evaluated_rules['all'][['support', 'confidence', 'lift', 'jaccard']],
+                             x='support', y='confidence', size='lift', color='jaccard')
     
     except Exception as e:
         st.error("""
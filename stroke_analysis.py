@@ -45,38 +45,38 @@ def main():
     
     # Afficher les meilleures règles selon différentes métriques
     print("\nMeilleures règles par Lift (Indépendance):")
-    for idx, rule in evaluated_rules['by_lift'].head(5).iterrows():
+    for rule in evaluated_rules['by_lift'].head(5).to_dict('records'):
         print("\nRègle:", format_rule(rule))
         print_rule_metrics(rule)
     
     print("\nMeilleures règles par Confiance (Fiabilité):")
-    for idx, rule in evaluated_rules['by_confidence'].head(5).iterrows():
+    for rule in evaluated_rules['by_confidence'].head(5).to_dict('records'):
         print("\nRègle:", format_rule(rule))
         print_rule_metrics(rule)
     
     print("\nMeilleures règles par Conviction (Dépendance):")
-    for idx, rule in evaluated_rules['by_conviction'].head(5).iterrows():
+    for rule in evaluated_rules['by_conviction'].head(5).to_dict('records'):
         print("\nRègle:", format_rule(rule))
         print_rule_metrics(rule)
     
     print("\nMeilleures règles par Jaccard (Similarité):")
-    for idx, rule in evaluated_rules['by_jaccard'].head(5).iterrows():
+    for rule in evaluated_rules['by_jaccard'].head(5).to_dict('records'):
         print("\nRègle:", format_rule(rule))
         print_rule_metrics(rule)
     
     print("\nMeilleures règles par Certainty Factor (Certitude):")
-    for idx, rule in evaluated_rules['by_certainty'].head(5).iterrows():
+    for rule in evaluated_rules['by_certainty'].head(5).to_dict('records'):
         print("\nRègle:", format_rule(rule))
         print_rule_metrics(rule)
     
     print("\nMeilleures règles par Information Gain (Information):")
-    for idx, rule in evaluated_rules['by_information'].head(5).iterrows():
+    for rule in evaluated_rules['by_information'].head(5).to_dict('records'):
         print("\nRègle:", format_rule(rule))
         print_rule_metrics(rule)
     
     # Visualisation des métriques
     plt.figure(figsize=(12, 6))
-    sns.scatterplot(data=rules, x='support', y='confidence', size='lift', hue='jaccard')
+    sns.scatterplot(data=evaluated_rules['all'], x='support', y='confidence', size='lift', hue='jaccard')
     plt.title('Relation entre Support, Confiance, Lift et Jaccard')
     plt.savefig('rule_metrics_visualization.png')
     plt.close()
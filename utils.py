@@ -1,9 +1,8 @@
+import os
 import pandas as pd
 import numpy as np
-from mlxtend.frequent_patterns import apriori, association_rules
+from mlxtend.frequent_patterns import fpgrowth, association_rules
 from mlxtend.preprocessing import TransactionEncoder
-from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler
 
 VARIABLE_MAPPING = {
     # Type de travail 
@@ -59,10 +58,33 @@ VARIABLE_MAPPING = {
     'g3': 'glucose_>150'
 }
 
+# Mapping inverse (nom de colonne normalisé -> code), calculé une seule fois
+_REVERSE_MAPPING = {v.replace(" ", "_"): k for k, v in VARIABLE_MAPPING.items()}
+
+# Version du format du cache prétraité (à incrémenter si le prétraitement change)
+_CACHE_VERSION = 3
+
 
 
 
 def load_and_preprocess_data(file_path):
+    # 0. Cache disque du prétraitement (invalidé si le CSV ou ce module est
+    # plus récent, ou si les colonnes ne correspondent pas au mapping)
+    # (un fichier de cache par CSV source)
+    csv_name = os.path.splitext(os.path.basename(file_path))[0]
+    cache_path = os.path.join(os.path.dirname(file_path),
+                              f'{csv_name}.preprocessed_v{_CACHE_VERSION}.parquet')
+    if (os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) > max(os.path.getmtime(file_path), os.path.getmtime(__file__))):
+        try:
+            cached = pd.read_parquet(cache_path)
+            if set(cached.columns) <= set(_REVERSE_MAPPING.values()) and (cached.dtypes == bool).all():
+                print(f"Chargement des données prétraitées depuis {cache_path}...")
+                return cached
+            print(f"Cache {cache_path} invalide, nouveau prétraitement...")
+        except Exception as e:
+            print(f"Cache {cache_path} illisible ({str(e)}), nouveau prétraitement...")
+    
     # 1. Chargement des données
     df = pd.read_csv(file_path)
     
@@ -71,76 +93,77 @@ def load_and_preprocess_data(file_path):
     
     # Imputation numérique
     numeric_columns = ['bmi', 'avg_glucose_level', 'age']
-    numeric_imputer = SimpleImputer(strategy='mean')
-    df[numeric_columns] = numeric_imputer.fit_transform(df[numeric_columns])
+    df[numeric_columns] = df[numeric_columns].fillna(df[numeric_columns].mean())
     
     # Imputation catégorielle
     categorical_columns = ['gender', 'ever_married', 'work_type', 'Residence_type', 'smoking_status']
-    categorical_imputer = SimpleImputer(strategy='most_frequent')
-    df[categorical_columns] = categorical_imputer.fit_transform(df[categorical_columns])
+    df[categorical_columns] = df[categorical_columns].fillna(df[categorical_columns].mode().iloc[0])
     
     # 3. Discrétisation des variables continues
     print("Discrétisation des variables continues...")
     
-    df['age'] = pd.cut(df['age'], 
-                      bins=[0, 30, 60, 100], 
-                      labels=['age_<30', 'age_30-60', 'age_>60'])
-    
-    df['bmi'] = pd.cut(df['bmi'],
-                      bins=[0, 18.5, 25, 30, 100],
-                      labels=['bmi_<18.5', 'bmi_18.5-25', 'bmi_25-30', 'bmi_>30'])
-    
-    df['avg_glucose_level'] = pd.cut(df['avg_glucose_level'],
-                                   bins=[0, 100, 150, 300],
-                                   labels=['glucose_<100', 'glucose_100-150', 'glucose_>150'])
-    
-    # 4. Conversion des variables binaires en one-hot
-    print("Conversion des variables binaires...")
-    
-    binary_columns = {
-        'hypertension': ['hypertension_0', 'hypertension_1'],
-        'heart_disease': ['heart_disease_0', 'heart_disease_1'],
-        'stroke': ['stroke_0', 'stroke_1']
+    # Indices de classe (intervalles fermés à droite, comme pd.cut) puis
+    # indicateurs construits directement par indexation d'une matrice identité
+    continuous_bins = {
+        'age': ([0, 30, 60, 100], ['age_<30', 'age_30-60', 'age_>60']),
+        'bmi': ([0, 18.5, 25, 30, 100], ['bmi_<18.5', 'bmi_18.5-25', 'bmi_25-30', 'bmi_>30']),
+        'avg_glucose_level': ([0, 100, 150, 300], ['glucose_<100', 'glucose_100-150', 'glucose_>150'])
     }
     
-    for col, new_cols in binary_columns.items():
-        df[new_cols[0]] = (df[col] == 0).astype(int)
-        df[new_cols[1]] = (df[col] == 1).astype(int)
+    for col, (bins, labels) in continuous_bins.items():
+        values = df[col].to_numpy()
+        bin_idx = np.digitize(values, bins[1:-1], right=True)
+        one_hot = np.eye(len(labels), dtype=np.uint8)[bin_idx]
+        # Valeurs hors de ]min, max] : aucun indicateur (NaN avec pd.cut)
+        one_hot[(values <= bins[0]) | (values > bins[-1])] = 0
+        df[labels] = one_hot
+    
+    df = df.drop(columns=list(continuous_bins))
     
-    # 5. One-hot encoding pour les autres variables catégorielles
+    # 4. One-hot encoding des variables binaires et catégorielles
     print("Encodage des variables catégorielles...")
     
+    # Suppression des colonnes sans indicateur dans le mapping (identifiant)
+    df = df.drop(columns=['id'], errors='ignore')
+    
     df = pd.get_dummies(df, columns=[
+        'hypertension',
+        'heart_disease',
+        'stroke',
         'gender',
         'ever_married',
         'work_type',
         'Residence_type',
-        'smoking_status',
-        'age',
-        'bmi',
-        'avg_glucose_level'
-    ], prefix_sep='_', drop_first=False)
+        'smoking_status'
+    ], prefix_sep='_', drop_first=False, dtype=np.uint8)
     
-    # 6. Uniformisation des noms de colonnes
+    # 5. Uniformisation des noms de colonnes
     print("Uniformisation des noms de colonnes...")
     
     # Remplacement des espaces par des underscores
     df.columns = [col.replace(" ", "_") for col in df.columns]
     
-    # 7. Renommage final selon VARIABLE_MAPPING
+    # 6. Renommage final selon VARIABLE_MAPPING
     print("Application du mapping...")
     
-    # Création du mapping inverse avec noms normalisés
-    reverse_mapping = {v.replace(" ", "_"): k for k, v in VARIABLE_MAPPING.items()}
-    
     # Sélection uniquement des colonnes qui existent dans le mapping
-    cols_to_keep = [col for col in df.columns if col in reverse_mapping]
-    df = df[cols_to_keep]
+    cols_to_keep = [col for col in df.columns if col in _REVERSE_MAPPING]
     
-    # Renommage final
-    df.rename(columns=reverse_mapping, inplace=True)
+    # Renommage final et conversion unique en booléens (attendus par FP-Growth)
+    df = df[cols_to_keep].rename(columns=_REVERSE_MAPPING).astype(bool)
     
-    # 8. Vérification finale
+    # Sauvegarde du résultat prétraité (fichier temporaire puis remplacement
+    # atomique : un lecteur ne voit jamais de fichier partiel)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        df.to_parquet(tmp_path, compression='snappy')
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Impossible d'écrire le cache {cache_path}: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    
+    # 7. Vérification finale
     print("\nRésumé du prétraitement:")
     print(f"Shape final: {df.shape}")
     print(f"Colonnes finales: {list(df.columns)}")
@@ -151,20 +174,35 @@ def load_and_preprocess_data(file_path):
 
 
 
-def generate_association_rules(df, min_support=0.01, min_confidence=0.3):
+def mine_frequent_itemsets(df, min_support=0.01, max_len=4):
+    """
+    Extrait les itemsets fréquents (FP-Growth : pas de génération de candidats)
+    """
+    return fpgrowth(df, 
+                    min_support=min_support,
+                    use_colnames=True,
+                    max_len=max_len)
+
+
+def extract_rules(frequent_itemsets, min_confidence=0.3):
+    """
+    Génère les règles d'association à partir des itemsets fréquents
+    """
+    return association_rules(frequent_itemsets, 
+                             metric="confidence",
+                             min_threshold=min_confidence)
+
+
+def generate_association_rules(df, min_support=0.01, min_confidence=0.3, max_len=4):
     """
     Génère des règles d'association à partir du DataFrame prétraité
     """
     try:
         # Générer les itemsets fréquents
-        frequent_itemsets = apriori(df.astype(bool), 
-                                  min_support=min_support,
-                                  use_colnames=True)
+        frequent_itemsets = mine_frequent_itemsets(df, min_support, max_len)
         
         # Générer les règles
-        rules = association_rules(frequent_itemsets, 
-                                metric="confidence",
-                                min_threshold=min_confidence)
+        rules = extract_rules(frequent_itemsets, min_confidence)
         
         return rules
     
@@ -173,39 +211,42 @@ def generate_association_rules(df, min_support=0.01, min_confidence=0.3):
         return pd.DataFrame()  # Retourne un DataFrame vide en cas d'erreur
 
 
-def evaluate_rules(rules):
+def evaluate_rules(rules, top_n=5):
     """
     Évalue les règles d'association en utilisant différentes métriques
     selon les recommandations de l'article sur les mesures d'intérêt.
     """
     # 1. Métriques de base (Support, Confidence)
-    rules['support'] = rules['support']
-    rules['confidence'] = rules['confidence']
-    
-    # 2. Métriques d'indépendance et de dépendance
-    rules['lift'] = rules['lift']  # Mesure d'indépendance
-    rules['conviction'] = rules['conviction']  # Mesure de dépendance
-    rules['leverage'] = rules['leverage']  # Mesure de différence
+    # 2. Métriques d'indépendance et de dépendance (Lift, Conviction, Leverage)
+    # -> déjà calculées par mlxtend.association_rules
     
     # 3. Métriques supplémentaires recommandées par l'article
-    # Jaccard similarity
-    rules['jaccard'] = rules['support'] / (rules['antecedent support'] + rules['consequent support'] - rules['support'])
-    
-    # Certainty factor
-    rules['certainty_factor'] = (rules['confidence'] - rules['consequent support']) / (1 - rules['consequent support'])
+    # Extraction unique des colonnes en tableaux numpy
+    s = rules['support'].to_numpy()
+    a = rules['antecedent support'].to_numpy()
+    c = rules['consequent support'].to_numpy()
+    conf = rules['confidence'].to_numpy()
+    lift = rules['lift'].to_numpy()
     
-    # Information gain
-    rules['information_gain'] = rules['support'] * np.log2(rules['lift'])
+    # Un seul assign : Jaccard similarity, Certainty factor (nul lorsque le
+    # support du conséquent vaut 1), Information gain (lift borné pour éviter
+    # log2(0) = -inf)
+    rules = rules.assign(
+        jaccard=s / (a + c - s),
+        certainty_factor=np.divide(conf - c, 1 - c, out=np.zeros_like(c), where=(1 - c) != 0),
+        information_gain=s * np.log2(np.maximum(lift, np.finfo(float).tiny))
+    )
     
-    # Trier les règles selon différentes métriques
-    rules_by_lift = rules.sort_values('lift', ascending=False)
-    rules_by_confidence = rules.sort_values('confidence', ascending=False)
-    rules_by_conviction = rules.sort_values('conviction', ascending=False)
-    rules_by_jaccard = rules.sort_values('jaccard', ascending=False)
-    rules_by_certainty = rules.sort_values('certainty_factor', ascending=False)
-    rules_by_information = rules.sort_values('information_gain', ascending=False)
+    # Sélectionner les meilleures règles selon différentes métriques
+    rules_by_lift = rules.nlargest(top_n, 'lift')
+    rules_by_confidence = rules.nlargest(top_n, 'confidence')
+    rules_by_conviction = rules.nlargest(top_n, 'conviction')
+    rules_by_jaccard = rules.nlargest(top_n, 'jaccard')
+    rules_by_certainty = rules.nlargest(top_n, 'certainty_factor')
+    rules_by_information = rules.nlargest(top_n, 'information_gain')
     
     return {
+        'all': rules,
         'by_lift': rules_by_lift,
         'by_confidence': rules_by_confidence,
         'by_conviction': rules_by_conviction,